@@ -1,30 +1,90 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from starlette.middleware.gzip import GZipMiddleware
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 from typing import Optional, List, Dict
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, APIConnectionError, InternalServerError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+import asyncio
+import hashlib
+import httpx
 import os
 import base64
 import json
+import orjson
 import re
-from datetime import datetime
+import time
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
 
 # ==================== LOAD ENV ====================
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 if not GROQ_API_KEY:
-    print("WARNING: GROQ_API_KEY not found in .env - AI features will be disabled")
+    logger.warning("GROQ_API_KEY not found in .env - AI features will be disabled")
+    http_client = None
     groq_client = None
 else:
-    groq_client = Groq(api_key=GROQ_API_KEY)
+    # One pooled HTTP/2 client shared by every Groq call in this process
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=200),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+    # SDK retries are disabled; _create_completion retries with jittered backoff instead
+    groq_client = AsyncGroq(api_key=GROQ_API_KEY, http_client=http_client, max_retries=0)
+
+# Max number of reports analyzed concurrently by /analyze-lab/batch
+BATCH_CONCURRENCY = 8
+
+# Max reports per /analyze-lab/batch call; each one counts against ANALYZE_RATE_LIMIT
+BATCH_MAX_REQUESTS = 25
+
+# AI completion cache: entries are reused for AI_CACHE_TTL seconds, oldest evicted past AI_CACHE_MAXLEN
+AI_CACHE_MAXLEN = 1024
+AI_CACHE_TTL = 3600
+
+# Per-client limit shared by all AI-backed analysis endpoints (slowapi/limits syntax)
+ANALYZE_RATE_LIMIT = os.getenv("ANALYZE_RATE_LIMIT", "30/minute")
+# In-memory counters are per process; point this at shared storage (e.g. redis://host:6379)
+# when running more than one worker so the limit applies across all of them
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+
+# Prompts covering more result rows than this are built in a worker thread
+PROMPT_THREAD_MIN_ROWS = 200
+
+# Reports with at least this many lab values are classified in one batch kernel call
+# (Numba when installed, NumPy otherwise); below it the per-row loop is faster
+VECTORIZE_MIN_LABS = 200
 
 # ==================== APP ====================
 app = FastAPI(
     title="Lab Report Analyzer - AI-Powered Clinical Insights",
     description="Automated lab analysis with pattern recognition",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # ==================== CORS - FIXED ====================
@@ -36,6 +96,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ==================== COMPRESSION ====================
+# SSE frames must reach the client as soon as they are yielded, so the stream stays uncompressed
+_UNCOMPRESSED_PATHS = {"/analyze-lab/stream"}
+
+class _GZipExceptStreamsMiddleware(GZipMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in _UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+app.add_middleware(_GZipExceptStreamsMiddleware, minimum_size=1024)
+
+# ==================== RATE LIMITING ====================
+limiter = Limiter(key_func=get_remote_address, storage_uri=RATE_LIMIT_STORAGE_URI)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+# ==================== VALIDATION ERRORS ====================
+@app.exception_handler(RequestValidationError)
+async def _validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's default 422 body, rendered with orjson so echoed NaN/inf inputs become null instead of a 500"""
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
+# ==================== LOGGING ====================
+_log_handler = None
+_log_listener = None
+
+@app.on_event("startup")
+async def _start_logging():
+    """Route app logs through a queue so handlers never block the event loop"""
+    global _log_handler, _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _log_handler = QueueHandler(log_queue)
+    _log_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    logger.addHandler(_log_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    _log_listener.start()
+
+@app.on_event("shutdown")
+async def _stop_logging():
+    global _log_handler, _log_listener
+    if _log_listener is not None:
+        logger.removeHandler(_log_handler)
+        logger.propagate = True
+        _log_listener.stop()
+        _log_handler = _log_listener = None
+
+@app.on_event("shutdown")
+async def _close_http_client():
+    if http_client is not None:
+        await http_client.aclose()
+
 # ==================== REFERENCE RANGES DATABASE ====================
 REFERENCE_RANGES = {
     "CBC": {
@@ -89,20 +207,98 @@ REFERENCE_RANGES = {
     }
 }
 
+CRITICAL_THRESHOLDS = {
+    "Hemoglobin": (7.0, 20.0),
+    "WBC": (2.0, 30.0),
+    "Platelets": (50, 1000),
+    "Potassium": (2.5, 6.5),
+    "Sodium": (120, 160),
+    "Creatinine": (0.0, 5.0),
+    "Glucose": (40, 400),
+    "Bilirubin_Total": (0.0, 3.0),
+    "AST": (0.0, 300),
+    "ALT": (0.0, 300),
+}
+
+# ==================== FLATTENED LOOKUP TABLES ====================
+def _build_range_table(gender: str):
+    """Resolve REFERENCE_RANGES for one gender into (panel, test) -> (low, high, unit, is_critical, reference_range)"""
+    table = {}
+    for panel, tests in REFERENCE_RANGES.items():
+        for test_name, test_ref in tests.items():
+            if "both" in test_ref:
+                low, high = test_ref["both"]
+            else:
+                low, high = test_ref.get(gender, test_ref.get("male"))
+            table[(panel, test_name)] = (
+                low,
+                high,
+                test_ref["unit"],
+                test_name in CRITICAL_THRESHOLDS,
+                f"{low}-{high} {test_ref['unit']}",
+            )
+    return table
+
+RANGES_MALE = _build_range_table("male")
+RANGES_FEMALE = _build_range_table("female")
+
+# Structure-of-arrays view of the same tables, indexed by test id
+_TEST_IDS = {key: i for i, key in enumerate(RANGES_MALE)}
+_LOWS_M = np.array([RANGES_MALE[key][0] for key in _TEST_IDS], dtype=np.float64)
+_HIGHS_M = np.array([RANGES_MALE[key][1] for key in _TEST_IDS], dtype=np.float64)
+_LOWS_F = np.array([RANGES_FEMALE[key][0] for key in _TEST_IDS], dtype=np.float64)
+_HIGHS_F = np.array([RANGES_FEMALE[key][1] for key in _TEST_IDS], dtype=np.float64)
+_CRIT_MASK = np.array([RANGES_MALE[key][3] for key in _TEST_IDS], dtype=np.bool_)
+_REF_STRINGS_M = [RANGES_MALE[key][4] for key in _TEST_IDS]
+_REF_STRINGS_F = [RANGES_FEMALE[key][4] for key in _TEST_IDS]
+
+# Static payload, encoded once so /reference-ranges does no per-request serialization
+_REF_RANGES_BYTES = orjson.dumps({"status": "success", "ranges": REFERENCE_RANGES})
+# Weak ETags: GZipMiddleware may serve these bytes gzip-encoded, and a strong
+# validator would claim both encodings are byte-identical
+_REF_RANGES_ETAG = f'W/"{hashlib.md5(_REF_RANGES_BYTES).hexdigest()}"'
+
 # ==================== REQUEST SCHEMAS ====================
 class LabValue(BaseModel):
+    # NaN/inf compare false against every bound, so they are rejected up front
+    model_config = ConfigDict(extra="ignore", frozen=True, allow_inf_nan=False)
+    
     test_name: str
     value: float
     unit: str
     panel: str
 
 class AnalyzeLabRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    
     patient_age: int
     patient_gender: str
     lab_values: List[LabValue]
     previous_reports: Optional[List[Dict]] = None
     current_medications: Optional[List[str]] = None
 
+class BatchAnalyzeRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    
+    requests: List[AnalyzeLabRequest] = Field(max_length=BATCH_MAX_REQUESTS)
+
+# Batch bodies are parsed straight from raw JSON by pydantic-core, so the
+# request schema is declared manually for the OpenAPI docs
+_BATCH_REQUEST_SCHEMA = BatchAnalyzeRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+_BATCH_REQUEST_SCHEMA.pop("$defs", None)
+
+# ==================== RESULT TYPES ====================
+@dataclass(slots=True)
+class LabResult:
+    test: str
+    value: float
+    unit: str
+    panel: str
+    reference_range: str
+    severity: str
+    color: str
+    critical: bool
+
 # ==================== HELPER FUNCTIONS ====================
 def calculate_egfr(creatinine: float, age: int, gender: str, is_african_american: bool = False):
     """Calculate estimated Glomerular Filtration Rate"""
@@ -115,7 +311,7 @@ def calculate_egfr(creatinine: float, age: int, gender: str, is_african_american
         egfr = 141 * min(creatinine/k, 1)**alpha * max(creatinine/k, 1)**(-1.209) * 0.993**age * gender_factor * race_factor
         return round(egfr, 1)
     except Exception as e:
-        print(f"eGFR calculation error: {e}")
+        logger.error("eGFR calculation error: %s", e)
         return None
 
 def calculate_cholesterol_ratios(lipid_values: Dict):
@@ -129,160 +325,326 @@ def calculate_cholesterol_ratios(lipid_values: Dict):
         if "Triglycerides" in lipid_values and "HDL" in lipid_values and lipid_values["HDL"] != 0:
             ratios["TG_HDL_Ratio"] = round(lipid_values["Triglycerides"] / lipid_values["HDL"], 2)
     except Exception as e:
-        print(f"Cholesterol ratio calculation error: {e}")
+        logger.error("Cholesterol ratio calculation error: %s", e)
     return ratios
 
 def classify_severity(value: float, ref_range: tuple, is_critical: bool = False):
-    """Classify abnormality severity with clinically accurate terminology"""
+    """Classify abnormality severity with clinically accurate terminology.
+    
+    Returns a (severity, color, critical) tuple.
+    """
     low, high = ref_range
     
     if low <= value <= high:
-        return {"severity": "normal", "color": "green", "critical": False}
+        return "normal", "green", False
     
     if value < low:
-        diff_percent = ((low - value) / low) * 100
+        # A zero lower bound (e.g. LDL) has no relative scale; treat as a severe deviation
+        diff_percent = ((low - value) / low) * 100 if low > 0 else 100
         if is_critical or diff_percent > 50:
-            return {"severity": "severely low", "color": "red", "critical": True}
+            return "severely low", "red", True
         elif diff_percent > 25:
-            return {"severity": "moderately low", "color": "orange", "critical": False}
+            return "moderately low", "orange", False
         else:
-            return {"severity": "mildly low", "color": "yellow", "critical": False}
+            return "mildly low", "yellow", False
     
     if value > high:
         diff_percent = ((value - high) / high) * 100
         if is_critical or diff_percent > 50:
-            return {"severity": "severely elevated", "color": "red", "critical": True}
+            return "severely elevated", "red", True
         elif diff_percent > 25:
-            return {"severity": "moderately elevated", "color": "orange", "critical": False}
+            return "moderately elevated", "orange", False
         else:
-            return {"severity": "mildly elevated", "color": "yellow", "critical": False}
+            return "mildly elevated", "yellow", False
+
+# ==================== VECTORIZED CLASSIFICATION ====================
+# Severity codes: 0 normal, -1/-2/-3 mildly/moderately/severely low, +1/+2/+3 elevated.
+# Indexed by code + 3.
+_SEVERITY_LUT = (
+    ("severely low", "red"),
+    ("moderately low", "orange"),
+    ("mildly low", "yellow"),
+    ("normal", "green"),
+    ("mildly elevated", "yellow"),
+    ("moderately elevated", "orange"),
+    ("severely elevated", "red"),
+)
+
+def classify_batch(values, lows, highs, crit_mask):
+    """Array version of classify_severity; returns (severity_code int8[:], critical bool[:])"""
+    n = values.shape[0]
+    severity = np.zeros(n, dtype=np.int8)
+    critical = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        value = values[i]
+        if value < lows[i]:
+            diff_percent = (lows[i] - value) / lows[i] * 100.0 if lows[i] > 0 else 100.0
+            if crit_mask[i] or diff_percent > 50.0:
+                severity[i] = -3
+                critical[i] = True
+            elif diff_percent > 25.0:
+                severity[i] = -2
+            else:
+                severity[i] = -1
+        elif value > highs[i]:
+            diff_percent = (value - highs[i]) / highs[i] * 100.0
+            if crit_mask[i] or diff_percent > 50.0:
+                severity[i] = 3
+                critical[i] = True
+            elif diff_percent > 25.0:
+                severity[i] = 2
+            else:
+                severity[i] = 1
+    return severity, critical
+
+if NUMBA_AVAILABLE:
+    # Explicit signature compiles at import (or loads the on-disk cache) instead of
+    # on the first large report, where it would block the event loop. Single-threaded:
+    # for a few hundred rows, thread launch costs more than it saves.
+    classify_batch = njit(
+        "Tuple((int8[:], boolean[:]))(float64[:], float64[:], float64[:], boolean[:])",
+        cache=True
+    )(classify_batch)
+
+def classify_batch_numpy(values: np.ndarray, lows: np.ndarray, highs: np.ndarray, crit_mask: np.ndarray):
+    """Branchless classify_batch built from NumPy masks, used when numba is not installed"""
+    # A zero lower bound counts as a severe deviation, like the compiled kernel
+    safe_lows = np.where(lows > 0, lows, 1.0)
+    low_diff = np.where(lows > 0, (lows - values) / safe_lows * 100.0, 100.0)
+    high_diff = (values - highs) / highs * 100.0
+    
+    low_code = np.where(crit_mask | (low_diff > 50.0), 3, np.where(low_diff > 25.0, 2, 1))
+    high_code = np.where(crit_mask | (high_diff > 50.0), 3, np.where(high_diff > 25.0, 2, 1))
+    severity = np.where(values < lows, -low_code, np.where(values > highs, high_code, 0)).astype(np.int8)
+    return severity, np.abs(severity) == 3
+
+_classify_batch_impl = classify_batch if NUMBA_AVAILABLE else classify_batch_numpy
+
+def _verify_batch_kernels():
+    """Check at import that the batch kernels classify exactly like classify_severity"""
+    probes = []
+    for test_id in range(len(_TEST_IDS)):
+        for lows, highs in ((_LOWS_M, _HIGHS_M), (_LOWS_F, _HIGHS_F)):
+            low, high = lows[test_id], highs[test_id]
+            for value in (low, high, (low + high) / 2, low * 0.8, low * 0.6, low * 0.4,
+                          high * 1.1, high * 1.4, high * 1.6, 0.0, -1.0):
+                probes.append((value, low, high, _CRIT_MASK[test_id]))
+    values, lows, highs, crit_mask = (np.array(column) for column in zip(*probes))
+    expected = [classify_severity(v, (lo, hi), bool(c)) for v, lo, hi, c in probes]
+    kernels = [classify_batch_numpy] + ([classify_batch] if NUMBA_AVAILABLE else [])
+    for kernel in kernels:
+        codes, flags = kernel(values, lows, highs, crit_mask)
+        got = [(*_SEVERITY_LUT[code + 3], flag) for code, flag in zip(codes.tolist(), flags.tolist())]
+        if got != expected:
+            raise RuntimeError(f"{kernel.__name__} disagrees with classify_severity")
+
+_verify_batch_kernels()
+
+def _check_abnormalities_vectorized(lab_values: List[LabValue], female: bool):
+    """check_abnormalities for large panels, classifying every known test in one kernel call"""
+    abnormalities = []
+    all_results = {}
+    critical_values = []
+    creatinine = None
+    lipid_values = {}
+    
+    rows = []
+    test_ids = []
+    values = []
+    for row, lab in enumerate(lab_values):
+        if creatinine is None and lab.test_name == "Creatinine":
+            creatinine = lab.value
+        if lab.panel == "Lipid":
+            lipid_values[lab.test_name] = lab.value
+        
+        test_id = _TEST_IDS.get((lab.panel, lab.test_name))
+        if test_id is not None:
+            rows.append(row)
+            test_ids.append(test_id)
+            values.append(lab.value)
+    
+    ids = np.array(test_ids, dtype=np.intp)
+    lows, highs = (_LOWS_F, _HIGHS_F) if female else (_LOWS_M, _HIGHS_M)
+    ref_strings = _REF_STRINGS_F if female else _REF_STRINGS_M
+    severity_codes, critical_flags = _classify_batch_impl(
+        np.array(values, dtype=np.float64), lows[ids], highs[ids], _CRIT_MASK[ids]
+    )
+    
+    for row, test_id, code, critical in zip(rows, test_ids, severity_codes.tolist(), critical_flags.tolist()):
+        lab = lab_values[row]
+        severity, color = _SEVERITY_LUT[code + 3]
+        result = LabResult(
+            lab.test_name,
+            lab.value,
+            lab.unit,
+            lab.panel,
+            ref_strings[test_id],
+            severity,
+            color,
+            critical,
+        )
+        
+        all_results[lab.test_name] = result
+        
+        if code != 0:
+            abnormalities.append(result)
+        
+        if critical:
+            critical_values.append(result)
+    
+    return all_results, abnormalities, critical_values, creatinine, lipid_values
 
 def check_abnormalities(lab_values: List[LabValue], age: int, gender: str):
-    """Check all values against reference ranges"""
+    """Check all values against reference ranges.
+    
+    Also collects the Creatinine value and Lipid panel values in the same pass.
+    """
+    # Unknown genders fall back to the male ranges
+    female = gender.lower() == "female"
+    
+    if len(lab_values) >= VECTORIZE_MIN_LABS:
+        return _check_abnormalities_vectorized(lab_values, female)
+    
     abnormalities = []
     all_results = {}
     critical_values = []
+    creatinine = None
+    lipid_values = {}
     
-    CRITICAL_THRESHOLDS = {
-        "Hemoglobin": (7.0, 20.0),
-        "WBC": (2.0, 30.0),
-        "Platelets": (50, 1000),
-        "Potassium": (2.5, 6.5),
-        "Sodium": (120, 160),
-        "Creatinine": (0.0, 5.0),
-        "Glucose": (40, 400),
-        "Bilirubin_Total": (0.0, 3.0),
-        "AST": (0.0, 300),
-        "ALT": (0.0, 300),
-    }
+    table = RANGES_FEMALE if female else RANGES_MALE
     
     for lab in lab_values:
-        panel_refs = REFERENCE_RANGES.get(lab.panel, {})
-        test_ref = panel_refs.get(lab.test_name)
+        if creatinine is None and lab.test_name == "Creatinine":
+            creatinine = lab.value
+        if lab.panel == "Lipid":
+            lipid_values[lab.test_name] = lab.value
         
-        if not test_ref:
-            continue
+        entry = table.get((lab.panel, lab.test_name))
         
-        if "both" in test_ref:
-            ref_range = test_ref["both"]
-        else:
-            ref_range = test_ref.get(gender.lower(), test_ref.get("male"))
+        if not entry:
+            continue
         
-        is_critical_test = lab.test_name in CRITICAL_THRESHOLDS
-        severity_info = classify_severity(lab.value, ref_range, is_critical_test)
+        low, high, _, is_critical_test, reference_range = entry
+        severity, color, critical = classify_severity(lab.value, (low, high), is_critical_test)
         
-        result = {
-            "test": lab.test_name,
-            "value": lab.value,
-            "unit": lab.unit,
-            "panel": lab.panel,
-            "reference_range": f"{ref_range[0]}-{ref_range[1]} {test_ref['unit']}",
-            **severity_info
-        }
+        result = LabResult(
+            lab.test_name,
+            lab.value,
+            lab.unit,
+            lab.panel,
+            reference_range,
+            severity,
+            color,
+            critical,
+        )
         
         all_results[lab.test_name] = result
         
-        if severity_info["severity"] != "normal":
+        if severity != "normal":
             abnormalities.append(result)
         
-        if severity_info["critical"]:
+        if critical:
             critical_values.append(result)
     
-    return all_results, abnormalities, critical_values
+    return all_results, abnormalities, critical_values, creatinine, lipid_values
 
 def interpret_egfr(egfr: float):
     """Interpret eGFR value"""
     if egfr is None:
         return None
+    # Stage thresholds are whole numbers, so flooring keeps the staging exact
+    stage, description, color = _interpret_egfr_bucket(int(egfr))
+    return {"stage": stage, "description": description, "color": color}
+
+@lru_cache(maxsize=256)
+def _interpret_egfr_bucket(egfr: int):
+    """Returns an immutable (stage, description, color) tuple, safe to share across cache hits"""
     if egfr >= 90:
-        return {"stage": "Normal", "description": "Normal kidney function", "color": "green"}
+        return "Normal", "Normal kidney function", "green"
     elif egfr >= 60:
-        return {"stage": "Stage 1-2", "description": "Mild kidney dysfunction", "color": "yellow"}
+        return "Stage 1-2", "Mild kidney dysfunction", "yellow"
     elif egfr >= 30:
-        return {"stage": "Stage 3", "description": "Moderate kidney dysfunction", "color": "orange"}
+        return "Stage 3", "Moderate kidney dysfunction", "orange"
     elif egfr >= 15:
-        return {"stage": "Stage 4", "description": "Severe kidney dysfunction", "color": "red"}
+        return "Stage 4", "Severe kidney dysfunction", "red"
     else:
-        return {"stage": "Stage 5", "description": "Kidney failure", "color": "red"}
+        return "Stage 5", "Kidney failure", "red"
 
 def assess_cardiac_risk(ratios: Dict):
     """Assess cardiac risk from cholesterol ratios"""
     if "TC_HDL_Ratio" in ratios:
-        ratio = ratios["TC_HDL_Ratio"]
-        if ratio < 3.5:
-            return {"risk": "Low", "color": "green"}
-        elif ratio < 5.0:
-            return {"risk": "Moderate", "color": "yellow"}
-        else:
-            return {"risk": "High", "color": "red"}
+        risk, color = _cardiac_risk_for_ratio(ratios["TC_HDL_Ratio"])
+        return {"risk": risk, "color": color}
     return None
 
-# ==================== MAIN ENDPOINTS ====================
-@app.post("/analyze-lab")
-async def analyze_lab(request: AnalyzeLabRequest):
-    """Comprehensive lab analysis with AI insights"""
+@lru_cache(maxsize=1024)
+def _cardiac_risk_for_ratio(ratio: float):
+    """Returns an immutable (risk, color) tuple, safe to share across cache hits"""
+    if ratio < 3.5:
+        return "Low", "green"
+    elif ratio < 5.0:
+        return "Moderate", "yellow"
+    else:
+        return "High", "red"
+
+# ==================== AI RESPONSE CACHE ====================
+_ai_cache: "OrderedDict[str, tuple[float, str, str]]" = OrderedDict()
+_ai_cache_lock = asyncio.Lock()
+
+def _ai_cache_key(request: AnalyzeLabRequest):
+    """Canonical fingerprint of everything that feeds the AI prompts"""
+    payload = {
+        "a": request.patient_age,
+        "g": request.patient_gender,
+        "v": sorted((l.panel, l.test_name, round(l.value, 3), l.unit) for l in request.lab_values),
+        "m": sorted(request.current_medications or []),
+    }
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+async def _ai_cache_get(key: str):
+    """Return cached (detailed_analysis, physician_summary) or None"""
+    async with _ai_cache_lock:
+        entry = _ai_cache.get(key)
+        if entry is None:
+            return None
+        ts, detailed, summary = entry
+        if time.time() - ts >= AI_CACHE_TTL:
+            del _ai_cache[key]
+            return None
+        _ai_cache.move_to_end(key)
+        return detailed, summary
+
+async def _ai_cache_put(key: str, detailed: str, summary: str):
+    async with _ai_cache_lock:
+        _ai_cache[key] = (time.time(), detailed, summary)
+        _ai_cache.move_to_end(key)
+        while len(_ai_cache) > AI_CACHE_MAXLEN:
+            _ai_cache.popitem(last=False)
+
+# In-flight AI generations keyed by the same fingerprint, so identical concurrent
+# requests share one pair of Groq calls instead of stampeding past the cache
+_inflight: Dict[str, asyncio.Future] = {}
+
+async def _join_inflight(key: str):
+    """Wait for an identical in-flight generation; None if there is none or it was cancelled"""
+    inflight = _inflight.get(key)
+    if inflight is None:
+        return None
     try:
-        print(f"Received request: {request.patient_age}yo {request.patient_gender}, {len(request.lab_values)} tests")
-        
-        # Check abnormalities
-        all_results, abnormalities, critical_values = check_abnormalities(
-            request.lab_values, 
-            request.patient_age, 
-            request.patient_gender
-        )
-        
-        # Calculate eGFR if creatinine available
-        egfr = None
-        for lab in request.lab_values:
-            if lab.test_name == "Creatinine":
-                egfr = calculate_egfr(lab.value, request.patient_age, request.patient_gender)
-                break
-        
-        # Calculate cholesterol ratios
-        lipid_values = {lab.test_name: lab.value for lab in request.lab_values if lab.panel == "Lipid"}
-        cholesterol_ratios = calculate_cholesterol_ratios(lipid_values) if lipid_values else {}
-        
-        # Generate AI analysis
-        detailed_analysis = "Basic analysis complete. This decision support system provides insights for clinical review and does not constitute medical diagnosis or treatment directives."
-        physician_summary = "CDSS Analysis: Findings warrant physician review. This summary provides decision support insights based on available data and does not constitute a definitive diagnosis."
-        
-        if groq_client:
-            try:
-                abnormal_summary = "\n".join([
-                    f"- {a['test']}: {a['value']} {a['unit']} (Ref: {a['reference_range']}) - {a['severity']}"
-                    for a in abnormalities
-                ])
-                
-                meds_context = f"\nCurrent Medications: {', '.join(request.current_medications)}" if request.current_medications else ""
-                
-                analysis_prompt = f"""You are a Clinical Decision Support System (CDSS) analyzing lab results for {request.patient_age}yo {request.patient_gender}:
-{meds_context}
+        # Shielded so a cancelled follower does not cancel the shared work
+        return await asyncio.shield(inflight)
+    except asyncio.CancelledError:
+        if not inflight.cancelled():
+            raise
+        return None
 
-ABNORMAL VALUES:
-{abnormal_summary if abnormalities else "All values within normal range"}
+# ==================== AI PROMPTS ====================
+DEFAULT_DETAILED_ANALYSIS = "Basic analysis complete. This decision support system provides insights for clinical review and does not constitute medical diagnosis or treatment directives."
+DEFAULT_PHYSICIAN_SUMMARY = "CDSS Analysis: Findings warrant physician review. This summary provides decision support insights based on available data and does not constitute a definitive diagnosis."
 
-ALL TESTS PROVIDED:
-{', '.join([r['test'] for r in all_results.values()])}
+# Static instructions are sent as system messages so every request shares an
+# identical prompt prefix (eligible for provider-side prefix caching)
+CDSS_RULES = """You are a Clinical Decision Support System (CDSS) analyzing lab results for the patient described by the user.
 
 CRITICAL CDSS COMPLIANCE RULES:
 1. NEVER state diagnoses - use "suggestive of", "raises concern for", "may be consistent with", "warrants evaluation for"
@@ -302,25 +664,10 @@ Provide CDSS-appropriate clinical interpretation covering:
 
 Frame ALL recommendations as decision support, not medical directives. Be precise, evidence-based, and CDSS-compliant."""
 
-                completion = groq_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[{"role": "user", "content": analysis_prompt}],
-                    temperature=0.3,
-                    max_tokens=2000
-                )
-                detailed_analysis = completion.choices[0].message.content.strip()
-                
-                # Generate summary with CDSS framing
-                summary_prompt = f"""Create a CDSS-compliant 150-word physician summary.
+SUMMARY_RULES = """Create a CDSS-compliant 150-word physician summary of the lab findings provided by the user.
 
 **CRITICAL: This is Clinical Decision Support, NOT a diagnosis or treatment directive.**
 
-Patient: {request.patient_age}yo {request.patient_gender}
-Medications: {', '.join(request.current_medications) if request.current_medications else 'None reported'}
-
-Analysis:
-{detailed_analysis}
-
 Required Format:
 - Opening: "This decision support summary provides insights based on available data and does not constitute a definitive diagnosis."
 - Key Findings: Use "suggestive of", "raises concern for", "warrants evaluation for"
@@ -332,64 +679,389 @@ NEVER use: "diagnose", "treat with", "discontinue", "start medication"
 ALWAYS use: "suggests", "warrants", "may consider", "review recommended"
 
 Be precise, evidence-based, and CDSS-compliant."""
-                summary_completion = groq_client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[{"role": "user", "content": summary_prompt}],
-                    temperature=0.2,
-                    max_tokens=300
-                )
-                physician_summary = summary_completion.choices[0].message.content.strip()
-                
-            except Exception as e:
-                print(f"AI analysis error: {e}")
-                detailed_analysis = f"AI analysis error: {str(e)}. Basic results available."
+
+def _build_prompts(request: AnalyzeLabRequest, all_results: Dict, abnormalities: List, critical_values: List):
+    """Build the per-request (analysis_prompt, summary_prompt) user messages"""
+    abnormal_summary = "\n".join(
+        f"- {a.test}: {a.value} {a.unit} (Ref: {a.reference_range}) - {a.severity}"
+        for a in abnormalities
+    )
+    
+    meds_context = f"\nCurrent Medications: {', '.join(request.current_medications)}" if request.current_medications else ""
+    
+    analysis_prompt = f"""Patient: {request.patient_age}yo {request.patient_gender}{meds_context}
+
+ABNORMAL VALUES:
+{abnormal_summary if abnormalities else "All values within normal range"}
+
+ALL TESTS PROVIDED:
+{', '.join(all_results)}"""
+
+    # Summary is built from the structured findings so it does not have to
+    # wait for the detailed analysis
+    summary_prompt = f"""Patient: {request.patient_age}yo {request.patient_gender}
+Medications: {', '.join(request.current_medications) if request.current_medications else 'None reported'}
+
+Abnormal Values:
+{abnormal_summary if abnormalities else "All values within normal range"}
+
+Critical Values: {', '.join(c.test for c in critical_values) if critical_values else 'None'}
+Tests Provided: {', '.join(all_results.keys())}"""
+    
+    return analysis_prompt, summary_prompt
+
+async def _build_prompts_off_loop(request: AnalyzeLabRequest, all_results: Dict, abnormalities: List, critical_values: List):
+    """_build_prompts, run in a worker thread for large panels so it does not stall the event loop"""
+    if len(all_results) + len(abnormalities) > PROMPT_THREAD_MIN_ROWS:
+        return await asyncio.to_thread(_build_prompts, request, all_results, abnormalities, critical_values)
+    return _build_prompts(request, all_results, abnormalities, critical_values)
+
+def _analysis_completion_args(analysis_prompt: str):
+    return {
+        "model": "llama-3.3-70b-versatile",
+        "messages": [
+            {"role": "system", "content": CDSS_RULES},
+            {"role": "user", "content": analysis_prompt}
+        ],
+        "temperature": 0.3,
+        "max_tokens": 1200
+    }
+
+def _summary_completion_args(summary_prompt: str):
+    return {
+        "model": "llama-3.1-8b-instant",
+        "messages": [
+            {"role": "system", "content": SUMMARY_RULES},
+            {"role": "user", "content": summary_prompt}
+        ],
+        "temperature": 0.2,
+        "max_tokens": 250
+    }
+
+# Rate limits, 5xx responses and connection failures/timeouts are transient
+@retry(
+    retry=retry_if_exception_type((RateLimitError, InternalServerError, APIConnectionError)),
+    wait=wait_random_exponential(multiplier=0.5, max=8),
+    stop=stop_after_attempt(3),
+    reraise=True
+)
+async def _create_completion(**completion_args):
+    """groq_client.chat.completions.create with retries on transient Groq errors"""
+    return await groq_client.chat.completions.create(**completion_args)
+
+# ==================== MAIN ENDPOINTS ====================
+def _analyze_deterministic(request: AnalyzeLabRequest):
+    """Rule-based part of the analysis (no AI calls).
+    
+    Returns (report, all_results, abnormalities, critical_values).
+    """
+    logger.debug("Received request: %syo %s, %d tests", request.patient_age, request.patient_gender, len(request.lab_values))
+    
+    # Check abnormalities
+    all_results, abnormalities, critical_values, creatinine, lipid_values = check_abnormalities(
+        request.lab_values, 
+        request.patient_age, 
+        request.patient_gender
+    )
+    
+    # Calculate eGFR if creatinine available
+    egfr = calculate_egfr(creatinine, request.patient_age, request.patient_gender) if creatinine is not None else None
+    
+    # Calculate cholesterol ratios
+    cholesterol_ratios = calculate_cholesterol_ratios(lipid_values) if lipid_values else {}
+    
+    now = datetime.now(timezone.utc).isoformat()
+    report = {
+        "status": "success",
+        "analysis_date": now,
+        "patient_info": {
+            "age": request.patient_age,
+            "gender": request.patient_gender
+        },
+        "results_summary": {
+            "total_tests": len(request.lab_values),
+            "abnormal_count": len(abnormalities),
+            "critical_count": len(critical_values),
+            "normal_count": len(request.lab_values) - len(abnormalities)
+        },
+        # LabResult objects are serialized natively by orjson
+        "all_results": all_results,
+        "abnormalities": abnormalities,
+        "critical_values": critical_values,
+        "calculated_metrics": {
+            "egfr": egfr,
+            "egfr_interpretation": interpret_egfr(egfr) if egfr else None,
+            "cholesterol_ratios": cholesterol_ratios,
+            "cardiac_risk": assess_cardiac_risk(cholesterol_ratios) if cholesterol_ratios else None
+        },
+        # Kept alongside analysis_date for existing clients; same instant
+        "timestamp": now
+    }
+    return report, all_results, abnormalities, critical_values
+
+async def _generate_ai_texts(request: AnalyzeLabRequest, all_results: Dict, abnormalities: List, critical_values: List, ai_key: str):
+    """Run both Groq completions and return (detailed_analysis, physician_summary)"""
+    detailed_analysis = DEFAULT_DETAILED_ANALYSIS
+    physician_summary = DEFAULT_PHYSICIAN_SUMMARY
+    
+    try:
+        analysis_prompt, summary_prompt = await _build_prompts_off_loop(request, all_results, abnormalities, critical_values)
+        
+        # Run both completions concurrently
+        detailed_task = asyncio.create_task(
+            _create_completion(**_analysis_completion_args(analysis_prompt))
+        )
+        summary_task = asyncio.create_task(
+            _create_completion(**_summary_completion_args(summary_prompt))
+        )
+        completion, summary_completion = await asyncio.gather(
+            detailed_task, summary_task, return_exceptions=True
+        )
+        
+        if isinstance(completion, Exception):
+            logger.error("AI analysis error: %s", completion)
+            detailed_analysis = f"AI analysis error: {str(completion)}. Basic results available."
+        else:
+            detailed_analysis = completion.choices[0].message.content.strip()
+        
+        if isinstance(summary_completion, Exception):
+            logger.error("AI summary error: %s", summary_completion)
+        else:
+            physician_summary = summary_completion.choices[0].message.content.strip()
         
-        return {
-            "status": "success",
-            "analysis_date": datetime.now().isoformat(),
-            "patient_info": {
-                "age": request.patient_age,
-                "gender": request.patient_gender
-            },
-            "results_summary": {
-                "total_tests": len(request.lab_values),
-                "abnormal_count": len(abnormalities),
-                "critical_count": len(critical_values),
-                "normal_count": len(request.lab_values) - len(abnormalities)
-            },
-            "all_results": all_results,
-            "abnormalities": abnormalities,
-            "critical_values": critical_values,
-            "calculated_metrics": {
-                "egfr": egfr,
-                "egfr_interpretation": interpret_egfr(egfr) if egfr else None,
-                "cholesterol_ratios": cholesterol_ratios,
-                "cardiac_risk": assess_cardiac_risk(cholesterol_ratios) if cholesterol_ratios else None
-            },
-            "detailed_analysis": detailed_analysis,
-            "physician_summary": physician_summary,
-            "timestamp": datetime.now().isoformat()
-        }
+        # Only cache when both completions succeeded
+        if not isinstance(completion, Exception) and not isinstance(summary_completion, Exception):
+            await _ai_cache_put(ai_key, detailed_analysis, physician_summary)
         
     except Exception as e:
-        print(f"Analysis error: {e}")
+        logger.error("AI analysis error: %s", e)
+        detailed_analysis = f"AI analysis error: {str(e)}. Basic results available."
+    
+    return detailed_analysis, physician_summary
+
+async def _generate_ai_texts_coalesced(request: AnalyzeLabRequest, all_results: Dict, abnormalities: List, critical_values: List, ai_key: str):
+    """_generate_ai_texts, shared with any identical request already in flight"""
+    shared = await _join_inflight(ai_key)
+    if shared is not None:
+        return shared
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight[ai_key] = future
+    try:
+        result = await _generate_ai_texts(request, all_results, abnormalities, critical_values, ai_key)
+        future.set_result(result)
+        return result
+    finally:
+        # Followers fall back to generating on their own if this one was cancelled
+        if not future.done():
+            future.cancel()
+        if _inflight.get(ai_key) is future:
+            del _inflight[ai_key]
+
+async def _analyze_impl(request: AnalyzeLabRequest):
+    """Run the full lab analysis for a single request"""
+    report, all_results, abnormalities, critical_values = _analyze_deterministic(request)
+    
+    # Generate AI analysis
+    detailed_analysis = DEFAULT_DETAILED_ANALYSIS
+    physician_summary = DEFAULT_PHYSICIAN_SUMMARY
+    
+    if groq_client:
+        ai_key = _ai_cache_key(request)
+        cached = await _ai_cache_get(ai_key)
+        if cached:
+            detailed_analysis, physician_summary = cached
+        else:
+            detailed_analysis, physician_summary = await _generate_ai_texts_coalesced(
+                request, all_results, abnormalities, critical_values, ai_key
+            )
+    
+    report["detailed_analysis"] = detailed_analysis
+    report["physician_summary"] = physician_summary
+    return report
+
+# ==================== STREAMING ====================
+def _sse(event: str, data) -> bytes:
+    """Encode one Server-Sent Events frame"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+async def _stream_completion(completion_args: Dict, event: str, queue: asyncio.Queue):
+    """Forward streamed completion deltas to the queue as SSE frames and return the full text"""
+    try:
+        parts = []
+        stream = await _create_completion(**completion_args, stream=True)
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                queue.put_nowait(_sse(event, {"text": delta}))
+        return "".join(parts).strip()
+    finally:
+        # Signals the consumer that this stream is finished
+        queue.put_nowait(None)
+
+async def _stream_analysis(request: AnalyzeLabRequest, analysis):
+    """Yield the rule-based report first, then AI text deltas as they arrive"""
+    report, all_results, abnormalities, critical_values = analysis
+    yield _sse("result", report)
+    
+    cached = None
+    if groq_client:
+        ai_key = _ai_cache_key(request)
+        cached = await _ai_cache_get(ai_key) or await _join_inflight(ai_key)
+    
+    if not groq_client:
+        yield _sse("analysis_delta", {"text": DEFAULT_DETAILED_ANALYSIS})
+        yield _sse("summary_delta", {"text": DEFAULT_PHYSICIAN_SUMMARY})
+    elif cached:
+        yield _sse("analysis_delta", {"text": cached[0]})
+        yield _sse("summary_delta", {"text": cached[1]})
+    else:
+        analysis_prompt, summary_prompt = await _build_prompts_off_loop(request, all_results, abnormalities, critical_values)
+        queue = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(_stream_completion(_analysis_completion_args(analysis_prompt), "analysis_delta", queue)),
+            asyncio.create_task(_stream_completion(_summary_completion_args(summary_prompt), "summary_delta", queue)),
+        ]
+        try:
+            finished = 0
+            while finished < len(tasks):
+                frame = await queue.get()
+                if frame is None:
+                    finished += 1
+                else:
+                    yield frame
+            
+            detailed_analysis, physician_summary = await asyncio.gather(*tasks, return_exceptions=True)
+            for source, result in (("analysis", detailed_analysis), ("summary", physician_summary)):
+                if isinstance(result, Exception):
+                    logger.error("AI %s stream error: %s", source, result)
+                    yield _sse("error", {"source": source, "detail": f"AI {source} error: {str(result)}"})
+            
+            if not isinstance(detailed_analysis, Exception) and not isinstance(physician_summary, Exception):
+                await _ai_cache_put(ai_key, detailed_analysis, physician_summary)
+        finally:
+            # Stop generating if the client disconnected mid-stream
+            for task in tasks:
+                task.cancel()
+    
+    yield _sse("done", {"timestamp": datetime.now(timezone.utc).isoformat()})
+
+@app.post("/analyze-lab")
+@limiter.shared_limit(ANALYZE_RATE_LIMIT, scope="analyze")
+async def analyze_lab(request: Request, body: AnalyzeLabRequest):
+    """Comprehensive lab analysis with AI insights"""
+    try:
+        # Returned as a response directly so FastAPI's jsonable_encoder does not
+        # walk the LabResult dataclasses; orjson serializes them natively
+        return ORJSONResponse(await _analyze_impl(body))
+    except Exception as e:
+        logger.error("Analysis error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+async def _parse_batch_body(request: Request):
+    """Dependency parsing the batch body; runs before the rate limiter so it can charge per report"""
+    try:
+        body = BatchAnalyzeRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        # Built the same way as the pinned FastAPI (0.104) does for body fields:
+        # pydantic's errors() with "body" prefixed to each location
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+    request.state.batch_size = len(body.requests)
+    return body
+
+def _batch_cost(request: Request):
+    return max(1, getattr(request.state, "batch_size", 1))
+
+@app.post(
+    "/analyze-lab/batch",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": _BATCH_REQUEST_SCHEMA}}}}
+)
+@limiter.shared_limit(ANALYZE_RATE_LIMIT, scope="analyze", cost=_batch_cost)
+async def analyze_lab_batch(request: Request, body: BatchAnalyzeRequest = Depends(_parse_batch_body)):
+    """Analyze multiple lab reports in one call with bounded concurrency"""
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def _one(r: AnalyzeLabRequest):
+        async with sem:
+            return await _analyze_impl(r)
+    
+    results = await asyncio.gather(*(_one(r) for r in body.requests), return_exceptions=True)
+    
+    responses = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            logger.error("Batch analysis error (id=%d): %s", i, result)
+            responses.append({"id": i, "status": 500, "error": f"Analysis failed: {str(result)}"})
+        else:
+            responses.append({"id": i, "status": 200, "body": result})
+    
+    return ORJSONResponse({"responses": responses})
+
+@app.post("/analyze-lab/stream")
+@limiter.shared_limit(ANALYZE_RATE_LIMIT, scope="analyze")
+async def analyze_lab_stream(request: Request, body: AnalyzeLabRequest):
+    """Stream results as Server-Sent Events: result, analysis_delta, summary_delta, error, done"""
+    try:
+        analysis = _analyze_deterministic(body)
+    except Exception as e:
+        logger.error("Analysis error: %s", e)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    
+    return StreamingResponse(
+        _stream_analysis(body, analysis),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _static_json_response(request: Request, content: bytes, etag: str):
+    """Serve pre-encoded JSON, answering 304 when the client already has this ETag"""
+    headers = {"ETag": etag}
+    if_none_match = request.headers.get("if-none-match")
+    # If-None-Match uses weak comparison, so the W/ prefix is ignored on both sides
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag.removeprefix("W/") in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 @app.get("/reference-ranges")
-async def get_reference_ranges():
+async def get_reference_ranges(request: Request):
     """Get all reference ranges"""
-    return {"status": "success", "ranges": REFERENCE_RANGES}
+    return _static_json_response(request, _REF_RANGES_BYTES, _REF_RANGES_ETAG)
+
+# groq_enabled is fixed at startup, so the root payload is static too
+_ROOT_BYTES = orjson.dumps({
+    "message": "Lab Report Analyzer API v1.0",
+    "status": "operational",
+    "groq_enabled": groq_client is not None,
+    "endpoints": ["/analyze-lab", "/analyze-lab/batch", "/analyze-lab/stream", "/reference-ranges"]
+})
+_ROOT_ETAG = f'W/"{hashlib.md5(_ROOT_BYTES).hexdigest()}"'
 
 @app.get("/")
-async def root():
-    return {
-        "message": "Lab Report Analyzer API v1.0",
-        "status": "operational",
-        "groq_enabled": groq_client is not None,
-        "endpoints": ["/analyze-lab", "/reference-ranges"]
-    }
+async def root(request: Request):
+    return _static_json_response(request, _ROOT_BYTES, _ROOT_ETAG)
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
     print("Starting Lab Analyzer API on http://localhost:8000")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Each worker process imports this module, so it gets its own Groq client, AI cache
+    # and in-flight table. One worker by default; set WEB_CONCURRENCY (and a shared
+    # RATE_LIMIT_STORAGE_URI) to scale out
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        # Worker processes need an import string; a single worker serves the app object
+        # already built here instead of importing this module a second time
+        "app:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        # uvloop has no Windows build
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )